@@ -5,57 +5,83 @@ Author: Pranav Prasanth
 Description:
   Performs final deduplication and NA handling for all datasets before merging.
   Fills missing values for numeric columns with 0 and for categorical columns with mode/Unknown.
+  Downcasts numeric columns and stores low-cardinality text columns as categoricals to keep the outputs small.
   Corresponds to the workflow in Section 3.5 of the dissertation.
 
+Usage:
+  python Cleaning.py
+  python -m cudf.pandas Cleaning.py   # opt-in: run the pandas code on the GPU with RAPIDS cudf.pandas
+
 Inputs:
-  - intermediate/epl_matchlogs_primary.csv
-  - intermediate/epl_player_summaries_cleaned.csv
-  - intermediate/injury_data_raw.csv
+  - intermediate/epl_matchlogs_primary.parquet
+  - intermediate/epl_player_summaries_cleaned.parquet
+  - intermediate/injury_data_raw.parquet
 
 Outputs:
-  - intermediate/epl_matchlogs_cleaned.csv
-  - intermediate/epl_player_summaries_cleaned_final.csv
-  - intermediate/injury_data_cleaned.csv
+  - intermediate/epl_matchlogs_cleaned.parquet
+  - intermediate/epl_player_summaries_cleaned_final.parquet
+  - intermediate/injury_data_cleaned.parquet
 """
 
 import pandas as pd
 import numpy as np
 import os
 
-# Clean EPL Matchlog
-df = pd.read_csv('intermediate/epl_matchlogs_primary.csv', parse_dates=['date'])
-df = df.drop_duplicates()
-df = df.dropna(subset=['player_name', 'matchday'])
+# Back text columns with Arrow strings so fill/mode work on contiguous UTF-8 buffers
+pd.options.future.infer_string = True
+
+# Player name keys stay plain strings: merge.py lowers them again, and .str.lower()
+# on a categorical falls back to Python's lowering instead of the Arrow kernel
+NAME_KEY_COLS = ['player_name', 'player_name_clean', 'Name']
 
-numeric_cols = df.select_dtypes(include=['float64', 'int64']).columns
-df[numeric_cols] = df[numeric_cols].fillna(0)
-for col in df.select_dtypes(include='object').columns:
-    df[col] = df[col].fillna(df[col].mode()[0] if not df[col].mode().empty else 'Unknown')
-df.to_csv('intermediate/epl_matchlogs_cleaned.csv', index=False)
+def downcast_dtypes(frame):
+    """
+    Shrink numeric columns to the narrowest dtype that holds their values and
+    convert low-cardinality text columns (teams, positions, statuses) to categoricals.
+    Player name keys are left as strings.
+    """
+    for col in frame.select_dtypes(include='integer').columns:
+        frame[col] = pd.to_numeric(frame[col], downcast='integer')
+    for col in frame.select_dtypes(include='float').columns:
+        frame[col] = pd.to_numeric(frame[col], downcast='float')
+    for col in frame.select_dtypes(include=['object', 'string']).columns:
+        if col not in NAME_KEY_COLS and frame[col].nunique() < 0.5 * len(frame):
+            frame[col] = frame[col].astype('category')
+    return frame
+
+def fill_missing(frame):
+    """
+    Fill numeric NAs with 0 and text NAs with the column mode (or 'Unknown' if the column is empty).
+    All fill values are collected into one mapping and applied in a single fillna pass.
+    """
+    fill_map = {col: 0 for col in frame.select_dtypes(include=['float64', 'int64']).columns}
+    text_cols = frame.select_dtypes(include=['object', 'string']).columns
+    modes = frame[text_cols].mode()
+    modes = modes.iloc[0] if not modes.empty else pd.Series(index=text_cols, dtype=object)
+    fill_map.update(modes.fillna('Unknown').to_dict())
+    return frame.fillna(fill_map)
+
+# Clean EPL Matchlog
+df = pd.read_parquet('intermediate/epl_matchlogs_primary.parquet')
+df = df.drop_duplicates().dropna(subset=['player_name', 'matchday'])
+df = downcast_dtypes(fill_missing(df))
+df.to_parquet('intermediate/epl_matchlogs_cleaned.parquet', compression='zstd', index=False)
 
 # Clean EPL Player Summary Dataset
-summaries = pd.read_csv('intermediate/epl_player_summaries_cleaned.csv')
-summaries = summaries.drop_duplicates()
-for col in summaries.select_dtypes(include='object').columns:
-    summaries[col] = summaries[col].fillna(summaries[col].mode()[0] if not summaries[col].mode().empty else 'Unknown')
-numeric_cols = summaries.select_dtypes(include=['float64', 'int64']).columns
-summaries[numeric_cols] = summaries[numeric_cols].fillna(0)
-summaries.to_csv('intermediate/epl_player_summaries_cleaned_final.csv', index=False)
+summaries = pd.read_parquet('intermediate/epl_player_summaries_cleaned.parquet')
+summaries = downcast_dtypes(fill_missing(summaries.drop_duplicates()))
+summaries.to_parquet('intermediate/epl_player_summaries_cleaned_final.parquet', compression='zstd', index=False)
 
 # Clean Injury Data
-injury_path = 'intermediate/injury_data_raw.csv'
+injury_path = 'intermediate/injury_data_raw.parquet'
 if os.path.exists(injury_path):
-    injuries = pd.read_csv(injury_path, dayfirst=True, low_memory=False)
+    injuries = pd.read_parquet(injury_path)
     if 'date_of_injury' in injuries.columns:
         injuries['date_of_injury'] = pd.to_datetime(injuries['date_of_injury'], errors='coerce')
     if 'date_of_return' in injuries.columns:
         injuries['date_of_return'] = pd.to_datetime(injuries['date_of_return'], errors='coerce')
-    injuries = injuries.drop_duplicates()
-    for col in injuries.select_dtypes(include='object').columns:
-        injuries[col] = injuries[col].fillna(injuries[col].mode()[0] if not injuries[col].mode().empty else 'Unknown')
-    numeric_cols = injuries.select_dtypes(include=['float64', 'int64']).columns
-    injuries[numeric_cols] = injuries[numeric_cols].fillna(0)
-    injuries.to_csv('intermediate/injury_data_cleaned.csv', index=False)
+    injuries = downcast_dtypes(fill_missing(injuries.drop_duplicates()))
+    injuries.to_parquet('intermediate/injury_data_cleaned.parquet', compression='zstd', index=False)
 else:
     print("No injury data to clean.")
 
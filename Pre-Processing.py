@@ -13,67 +13,99 @@ Inputs:
   - epl_injuries_2015_2024_eplonly_cleaned.csv
 
 Outputs:
-  - intermediate/epl_matchlogs_primary.csv
-  - intermediate/epl_player_summaries_cleaned.csv
-  - intermediate/injury_data_raw.csv
+  - intermediate/epl_matchlogs_primary.parquet
+  - intermediate/epl_player_summaries_cleaned.parquet
+  - intermediate/injury_data_raw.parquet
 """
 
 import pandas as pd
 import os
-import re
+from datetime import datetime
+
+# Back text columns with Arrow strings so the .str lower/strip/contains calls run in Arrow kernels
+pd.options.future.infer_string = True
 
 os.makedirs('intermediate', exist_ok=True)
 
 # Load and save cleaned EPL matchlog
-matchlog_df = pd.read_csv('epl_matchlogs_final_cleaned.csv', parse_dates=['date'])
-matchlog_df.to_csv('intermediate/epl_matchlogs_primary.csv', index=False)
+matchlog_df = pd.read_csv('epl_matchlogs_final_cleaned.csv', parse_dates=['date'], engine='pyarrow')
+matchlog_df.to_parquet('intermediate/epl_matchlogs_primary.parquet', compression='zstd', index=False)
 
 # Parse repeated summary columns in player summary dataset
+# Maps the stat labels used in summary strings ('Squad: 10, Starting eleven: 9, ...')
+# to cleaned column suffixes; any other label is kept under its lower_snake_case name
+SUMMARY_KEYS = {
+    "Squad": "squad_appearances",
+    "Starting eleven": "starts",
+    "Substituted in": "subbed_in",
+    "On the bench": "on_bench",
+    "Suspended": "suspended",
+    "Injured": "injured",
+    "Absence": "absence"
+}
+SUMMARY_NAMES = {label.lower().replace(" ", "_"): name for label, name in SUMMARY_KEYS.items()}
+
 def parse_summary_col(s):
     """
-    Parse a summary column string of format 'Squad: 10, Starts: 9, Injured: 2' into a dict.
-    Returns a dict mapping cleaned stat names to integer values.
+    Expand a summary column of strings like 'Squad: 10, Starts: 9, Injured: 2' into integer columns.
+    Pulls every 'Key: value' pair out in one vectorized extractall pass and returns a DataFrame of
+    int32 columns, known stats first in SUMMARY_KEYS order, then unknown keys as first seen.
     """
-    if pd.isnull(s):
-        return {}
-    d = {}
-    for part in s.split(","):
-        if ":" in part:
-            k, v = part.split(":", 1)
-            k = k.strip().lower().replace(" ", "_")
-            k = {
-                "squad": "squad_appearances",
-                "starting_eleven": "starts",
-                "substituted_in": "subbed_in",
-                "on_the_bench": "on_bench",
-                "suspended": "suspended",
-                "injured": "injured",
-                "absence": "absence"
-            }.get(k, k)
-            d[k] = int(re.sub(r'[^\d]', '', v.strip()) or 0)
-    return d
+    pairs = s.str.extractall(r'(?:^|,)\s*([^,:]+?)\s*:\s*([^,]*)')
+    if pairs.empty:
+        return pd.DataFrame(index=s.index)
+    keys = pairs[0].str.lower().str.replace(" ", "_", regex=False).replace(SUMMARY_NAMES)
+    values = pairs[1].str.replace(r'[^\d]', '', regex=True).replace('', '0').astype('int32')
+    rows = pairs.index.get_level_values(0)
+    # The last value wins when a key repeats within one string
+    wide = values.groupby([rows, keys.to_numpy()], sort=False).last().unstack(fill_value=0)
+    known = [name for name in SUMMARY_KEYS.values() if name in wide.columns]
+    unknown = [k for k in keys.drop_duplicates() if k not in known]
+    wide = wide.reindex(index=s.index, columns=known + unknown, fill_value=0).astype('int32')
+    return wide.add_prefix(f"{s.name}_").rename_axis(columns=None)
 
-summaries_raw = pd.read_csv('epl_player_summaries_clean.csv')
-summary_cols = [col for col in summaries_raw.columns if summaries_raw[col].astype(str).str.contains('Squad:', na=False).any()]
-for col in summary_cols:
-    expanded = summaries_raw[col].apply(parse_summary_col).apply(pd.Series).add_prefix(f"{col}_")
-    summaries_raw = pd.concat([summaries_raw, expanded], axis=1)
+summaries_raw = pd.read_csv('epl_player_summaries_clean.csv', engine='pyarrow')
+# Probe the first non-null values of each column rather than scanning every cell
+summary_cols = [col for col in summaries_raw.columns if summaries_raw[col].dropna().head(32).astype(str).str.contains('Squad:', na=False).any()]
+expanded = [parse_summary_col(summaries_raw[col].astype(str)) for col in summary_cols]
+summaries_raw = pd.concat([summaries_raw, *expanded], axis=1)
 summaries_cleaned = summaries_raw.drop(columns=summary_cols)
 if 'player_name' in summaries_cleaned.columns:
     summaries_cleaned['player_name_clean'] = summaries_cleaned['player_name'].str.lower().str.strip()
-summaries_cleaned.to_csv('intermediate/epl_player_summaries_cleaned.csv', index=False)
+summaries_cleaned.to_parquet('intermediate/epl_player_summaries_cleaned.parquet', compression='zstd', index=False)
 
 # Load and clean injury dataset
+# Known date layouts in the injury exports, tried in order against the first non-null value
+DATE_FORMATS = ['%Y-%m-%d', '%d/%m/%Y', '%b %d, %Y', '%d.%m.%Y']
+
+def parse_date_col(s):
+    """
+    Parse a date column with an explicit format sniffed from its first non-null value.
+    Falls back to day-first inference if no known format matches.
+    """
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return s
+    sample = s.dropna()
+    if not sample.empty:
+        first = str(sample.iloc[0]).strip()
+        for fmt in DATE_FORMATS:
+            try:
+                datetime.strptime(first, fmt)
+            except ValueError:
+                continue
+            return pd.to_datetime(s, format=fmt, errors='coerce', cache=True)
+    return pd.to_datetime(s, dayfirst=True, errors='coerce', cache=True)
+
 injury_path = 'epl_injuries_2015_2024_eplonly_cleaned.csv'
 if os.path.exists(injury_path):
-    injury_df = pd.read_csv(injury_path, dayfirst=True, low_memory=False, encoding='utf-8')
+    injury_df = pd.read_csv(injury_path, encoding='utf-8', engine='pyarrow')
     if 'Name' in injury_df.columns:
         injury_df['player_name_clean'] = injury_df['Name'].str.lower().str.strip()
     if 'Date of Injury' in injury_df.columns:
-        injury_df['date_of_injury'] = pd.to_datetime(injury_df['Date of Injury'], errors='coerce')
+        injury_df['date_of_injury'] = parse_date_col(injury_df['Date of Injury'])
     if 'Date of return' in injury_df.columns:
-        injury_df['date_of_return'] = pd.to_datetime(injury_df['Date of return'], errors='coerce')
-    injury_df.to_csv('intermediate/injury_data_raw.csv', index=False)
+        injury_df['date_of_return'] = parse_date_col(injury_df['Date of return'])
+    injury_df.to_parquet('intermediate/injury_data_raw.parquet', compression='zstd', index=False)
 else:
     print("No injury data found.")
     
@@ -8,7 +8,7 @@ Description:
   Implements the visualization and dashboarding methodology described in Section 3.11 of the dissertation.
 
 Inputs:
-  - feature_engineered_dataset.csv
+  - feature_engineered_dataset.parquet
 
 Usage:
   Run with: streamlit run dashboard_app.py
@@ -16,19 +16,22 @@ Usage:
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
+import plotly.graph_objects as go
+import pyarrow.dataset as ds
 
 @st.cache_data
-def filter_large_csv(
-    csv_path,
+def filter_parquet(
+    parquet_path,
     season_options=None,
     position_options=None,
     event_period_options=None,
-    club_options=None,
-    chunk_size=1000
+    club_options=None
 ):
     """
-    Efficiently filter a large CSV file in chunks based on filter selections.
+    Filter the Parquet dataset on disk based on filter selections.
+    Predicates are pushed down to Arrow so only matching rows of the needed columns are loaded.
     Returns a filtered DataFrame.
     """
     needed_cols = [
@@ -39,93 +42,180 @@ def filter_large_csv(
         "club_missed_games_for", "injured_since", "injured_until",
         "minutes_played"
     ]
-    filtered_chunks = []
-    for chunk in pd.read_csv(csv_path, parse_dates=["date"], chunksize=chunk_size, usecols=needed_cols):
-        mask = pd.Series([True] * len(chunk), index=chunk.index)
-        if season_options:
-            mask &= chunk["season_epl"].isin(season_options)
-        if position_options:
-            mask &= chunk["position_type"].isin(position_options)
-        if event_period_options:
-            mask &= chunk["event_period"].isin(event_period_options)
-        if club_options:
-            mask &= (chunk["home_team_clean"].isin(club_options)) | (chunk["away_team_clean"].isin(club_options))
-        filtered_chunks.append(chunk[mask])
-    if filtered_chunks:
-        return pd.concat(filtered_chunks, ignore_index=True)
-    else:
-        return pd.DataFrame()
+    predicates = []
+    if season_options:
+        predicates.append(ds.field("season_epl").isin(season_options))
+    if position_options:
+        predicates.append(ds.field("position_type").isin(position_options))
+    if event_period_options:
+        predicates.append(ds.field("event_period").isin(event_period_options))
+    if club_options:
+        predicates.append(ds.field("home_team_clean").isin(club_options) | ds.field("away_team_clean").isin(club_options))
+    row_filter = None
+    for predicate in predicates:
+        row_filter = predicate if row_filter is None else row_filter & predicate
+    table = ds.dataset(parquet_path, format="parquet").to_table(columns=needed_cols, filter=row_filter)
+    return table.to_pandas()
 
 @st.cache_data
 def load_data():
     """
-    Load the feature-engineered dataset from CSV.
+    Load the feature-engineered dataset from Parquet.
+    Text filter columns arrive as categoricals; integer count and flag columns are downcast to save memory.
     """
-    df = pd.read_csv("feature_engineered_dataset.csv", parse_dates=["date"])
+    df = pd.read_parquet("feature_engineered_dataset.parquet")
+    count_cols = [
+        "injury", "starts", "subs_in", "goals", "assists", "matchday",
+        "games_missed", "injury_days", "minutes_played"
+    ]
+    # Only integer columns are downcast: text such as injury types is left as is, and
+    # float columns (the ones holding NaN) stay float64 so KPI and chart means are unchanged
+    for col in [c for c in count_cols if c in df.columns and pd.api.types.is_integer_dtype(df[c])]:
+        df[col] = pd.to_numeric(df[col], downcast="integer")
+    # Per-player "ever injured" flag, computed once here rather than by each chart
+    # A 0/1 injury column is used when there is one; otherwise any recorded injury spell counts
+    if "injury" in df.columns and pd.api.types.is_numeric_dtype(df["injury"]):
+        injured = df["injury"].fillna(0).gt(0)
+    else:
+        injured = df["injured_since"].notna() if "injured_since" in df.columns else pd.Series(False, index=df.index)
+    df["injured_ever"] = injured.groupby(df["player_name_matchlog"], observed=True, sort=False).transform("max").fillna(0).astype("int8")
     return df
 
 df = load_data()
 
+@st.cache_data
 def filter_in_memory(
-    df,
-    season_options=None,
-    position_options=None,
-    event_period_options=None,
-    club_options=None
+    season_options=(),
+    position_options=(),
+    event_period_options=(),
+    club_options=()
 ):
     """
-    Filter an in-memory DataFrame based on filter selections.
+    Filter the loaded dataset in memory based on filter selections.
+    Pass selections as sorted tuples, e.g. tuple(sorted(selected_season)), so identical
+    filter sets hit the cache. Selections are combined into a single boolean array.
     """
-    df_filtered = df.copy()
+    df = load_data()
+    masks = []
     if season_options:
-        df_filtered = df_filtered[df_filtered["season_epl"].isin(season_options)]
+        masks.append(df["season_epl"].isin(season_options).to_numpy())
     if position_options:
-        df_filtered = df_filtered[df_filtered["position_type"].isin(position_options)]
+        masks.append(df["position_type"].isin(position_options).to_numpy())
     if event_period_options:
-        df_filtered = df_filtered[df_filtered["event_period"].isin(event_period_options)]
+        masks.append(df["event_period"].isin(event_period_options).to_numpy())
     if club_options:
-        df_filtered = df_filtered[
-            (df_filtered["home_team_clean"].isin(club_options)) |
-            (df_filtered["away_team_clean"].isin(club_options))
-        ]
-    return df_filtered
-
-# --- Club Name Mapping for dashboard display ---
-CLUB_NAME_MAP = {
-    "Arsenal": "Arsenal FC",
-    "Aston Villa": "Aston Villa",
-    "Bournemouth": "AFC Bournemouth",
-    "Brentford": "Brentford FC",
-    "Brighton": "Brighton & Hove Albion",
-    "Burnley": "Burnley FC",
-    "Cardiff": "Cardiff City",
-    "Chelsea": "Chelsea FC",
-    "Crystal Palace": "Crystal Palace",
-    "Everton": "Everton FC",
-    "Forest": "Nottingham Forest",
-    "Fulham": "Fulham FC",
-    "Huddersfield": "Huddersfield Town",
-    "Hull City": "Hull City",
-    "Leeds": "Leeds United",
-    "Leicester": "Leicester City",
-    "Liverpool": "Liverpool FC",
-    "Luton": "Luton Town",
-    "Man City": "Manchester City",
-    "Man Utd": "Manchester United",
-    "Middlesbrough": "Middlesbrough FC",
-    "Newcastle": "Newcastle United",
-    "Norwich": "Norwich City",
-    "Sheff Utd": "Sheffield United",
-    "Southampton": "Southampton FC",
-    "Stoke City": "Stoke City",
-    "Sunderland": "Sunderland AFC",
-    "Swansea": "Swansea City",
-    "Tottenham": "Tottenham Hotspur",
-    "Watford": "Watford FC",
-    "West Brom": "West Bromwich Albion",
-    "West Ham": "West Ham United",
-    "Wolves": "Wolverhampton Wanderers"
-}
+        masks.append(
+            df["home_team_clean"].isin(club_options).to_numpy() |
+            df["away_team_clean"].isin(club_options).to_numpy()
+        )
+    if not masks:
+        return df
+    return df[np.logical_and.reduce(masks)]
+
+# --- Cached league-level aggregates ---
+# The underscore-prefixed frame argument is not hashed by Streamlit; the dataset is fixed
+# for the app's lifetime, so each aggregate is computed once and reused across reruns.
+@st.cache_data
+def league_kpis(_df):
+    """
+    Compute the league-level KPI values shown at the top of the global overview.
+    """
+    n_players = _df["player_name_matchlog"].nunique()
+    n_injured = _df.loc[_df["injury"] == 1, "player_name_matchlog"].nunique()
+    return {
+        "matches": _df["matchday"].nunique(),
+        "players": n_players,
+        "pct_injured": 100 * n_injured / n_players,
+        "avg_games_missed": _df["games_missed"].mean()
+    }
+
+@st.cache_data
+def injuries_per_season(_df):
+    """
+    Count injured match rows per season.
+    """
+    return _df[_df["injury"] == 1].groupby("season_epl", observed=True)["injury"].count().reset_index()
+
+@st.cache_data
+def injuries_by_position(_df):
+    """
+    Count injured match rows per position.
+    """
+    return _df[_df["injury"] == 1].groupby("position_type", observed=True)["injury"].count().reset_index()
+
+@st.cache_data
+def injury_duration_counts(_df, labels):
+    """
+    Count injuries falling into the short (0-14d), medium (15-30d) and long (>30d) duration categories.
+    Only injured rows are binned, via a sorted-edge lookup rather than a full-column pd.cut.
+    """
+    days = _df.loc[_df["injury"] == 1, "injury_days"].to_numpy(dtype=float)
+    days = days[days >= 0]
+    counts = np.bincount(np.searchsorted([14, 30], days, side="left"), minlength=3)
+    return pd.Series(counts, index=labels)
+
+@st.cache_data
+def pre_post_frame(_df):
+    """
+    Slim pre/post-injury subset shared by the performance comparison charts, with per-90 rates.
+    """
+    perf_df = _df.loc[
+        _df["event_period"].isin(["pre", "post"]),
+        ["event_period", "matchday", "minutes_played", "goals", "assists"]
+    ].copy()
+    for col in ["goals", "assists"]:
+        perf_df[f"{col}_per90"] = perf_df[col] / (perf_df["minutes_played"].replace(0, np.nan) / 90)
+    return perf_df
+
+@st.cache_data
+def minutes_pre_post(_df):
+    """
+    Average minutes played before and after injury.
+    """
+    return pre_post_frame(_df).groupby("event_period", observed=True)["minutes_played"].mean().reset_index()
+
+@st.cache_data
+def goals_assists_pre_post(_df):
+    """
+    Average goals and assists per 90 minutes before and after injury.
+    """
+    return pre_post_frame(_df).groupby("event_period", observed=True)[["goals_per90", "assists_per90"]].mean().reset_index()
+
+@st.cache_data
+def workload_by_injury_status(_df):
+    """
+    Five-number summary of minutes played, split by whether the player was ever injured.
+    Returns one row per injured_ever value with columns 0.0, 0.25, 0.5, 0.75 and 1.0.
+    """
+    return _df.groupby("injured_ever")["minutes_played"].quantile([0.0, 0.25, 0.5, 0.75, 1.0]).unstack()
+
+@st.cache_data
+def events_by_period(_df):
+    """
+    Average starts, substitute appearances and minutes per injury period.
+    """
+    return _df.groupby("event_period", observed=True)[["starts", "subs_in", "minutes_played"]].mean().reset_index()
+
+@st.cache_data
+def recovery_curve(_df):
+    """
+    Average minutes played per matchday before and after injury.
+    """
+    return pre_post_frame(_df).groupby(["event_period", "matchday"], observed=True)["minutes_played"].mean().reset_index()
+
+@st.cache_resource
+def club_season_positions(_df):
+    """
+    Row positions of each (club, season) pair, so tab 2 looks its slice up instead of scanning every row.
+    """
+    return _df.groupby(["club_missed_games_for", "season_epl"], observed=True, sort=False).indices
+
+@st.cache_data
+def club_names(_df):
+    """
+    Sorted club names appearing as either home or away team, read from the categorical dictionaries.
+    """
+    return sorted(set(_df["home_team_clean"].cat.categories).union(_df["away_team_clean"].cat.categories))
 
 st.set_page_config(page_title="EPL Player Injury & Performance Dashboard", layout="wide")
 st.title("⚽ EPL Player Injury & Performance Dashboard")
@@ -137,16 +227,16 @@ with tab1:
     st.header("🌍 Global Overview (League Level)")
 
     # Display league-level KPIs
+    kpis = league_kpis(df)
     col1, col2, col3, col4 = st.columns(4)
     with col1:
-        st.metric("Total Matches", df["matchday"].nunique())
+        st.metric("Total Matches", kpis["matches"])
     with col2:
-        st.metric("Distinct Players", df["player_name_matchlog"].nunique())
+        st.metric("Distinct Players", kpis["players"])
     with col3:
-        pct_injured = 100 * df[df["injury"] == 1]["player_name_matchlog"].nunique() / df["player_name_matchlog"].nunique()
-        st.metric("% Players Injured", f"{pct_injured:.1f}%")
+        st.metric("% Players Injured", f"{kpis['pct_injured']:.1f}%")
     with col4:
-        st.metric("Avg Games Missed per Player", f"{df['games_missed'].mean():.2f}")
+        st.metric("Avg Games Missed per Player", f"{kpis['avg_games_missed']:.2f}")
 
     # Global chart selector
     global_chart_options = [
@@ -165,66 +255,57 @@ with tab1:
     if selected_global_chart == "Injuries per Season":
         # Shows temporal trends in injury frequency across seasons
         st.markdown("### 📈 Injuries per Season")
-        injuries_per_season = df[df["injury"] == 1].groupby("season_epl")["injury"].count().reset_index()
-        fig_season = px.line(injuries_per_season, x="season_epl", y="injury", markers=True, title="Total Injuries Each Season")
+        fig_season = px.line(injuries_per_season(df), x="season_epl", y="injury", markers=True, title="Total Injuries Each Season")
         st.plotly_chart(fig_season, use_container_width=True)
 
     elif selected_global_chart == "Injuries by Position":
         # Distribution of injuries across positions
         st.markdown("### 🟦 Injuries by Position")
-        injuries_by_pos = df[df["injury"] == 1].groupby("position_type")["injury"].count().reset_index()
-        fig_pos = px.bar(injuries_by_pos, x="position_type", y="injury", title="Injuries by Position")
+        fig_pos = px.bar(injuries_by_position(df), x="position_type", y="injury", title="Injuries by Position")
         st.plotly_chart(fig_pos, use_container_width=True)
 
     elif selected_global_chart == "Injury Duration Categories":
         # Categorizes injuries as short, medium, or long
         st.markdown("### 📊 Injury Duration Categories")
-        bins = [0, 14, 30, df["injury_days"].max()]
         labels = ["Short (<15d)", "Medium (15–30d)", "Long (>30d)"]
-        df["injury_duration_cat"] = pd.cut(df["injury_days"], bins=bins, labels=labels, include_lowest=True)
-        duration_counts = df[df["injury"] == 1]["injury_duration_cat"].value_counts().reindex(labels)
+        duration_counts = injury_duration_counts(df, labels)
         fig_duration = px.bar(x=labels, y=duration_counts.values, labels={"x": "Duration", "y": "Count"}, title="Injury Duration Categories")
         st.plotly_chart(fig_duration, use_container_width=True)
 
     elif selected_global_chart == "Minutes Played Pre vs Post Injury":
         # Compares average minutes played before and after injury
         st.markdown("### ⚽ Minutes Played Pre vs Post Injury")
-        perf_df = df[df["event_period"].isin(["pre", "post"])].copy()
-        perf_group = perf_df.groupby("event_period")["minutes_played"].mean().reset_index()
-        fig_min = px.bar(perf_group, x="event_period", y="minutes_played", title="Avg Minutes Played Pre vs Post Injury")
+        fig_min = px.bar(minutes_pre_post(df), x="event_period", y="minutes_played", title="Avg Minutes Played Pre vs Post Injury")
         st.plotly_chart(fig_min, use_container_width=True)
 
     elif selected_global_chart == "Goals/Assists Pre vs Post Injury (per 90)":
         # Shows changes in goal and assist rates pre- and post-injury
         st.markdown("### ⚡ Goals/Assists Pre vs Post Injury (per 90 mins)")
-        import numpy as np
-        perf_df = df[df["event_period"].isin(["pre", "post"])].copy()
-        for col in ["goals", "assists"]:
-            perf_df[f"{col}_per90"] = perf_df[col] / (perf_df["minutes_played"].replace(0, np.nan) / 90)
-        ga_group = perf_df.groupby("event_period")[["goals_per90", "assists_per90"]].mean().reset_index()
-        fig_ga = px.bar(ga_group, x="event_period", y=["goals_per90", "assists_per90"], barmode="group", title="Goals/Assists per 90 Pre vs Post Injury")
+        fig_ga = px.bar(goals_assists_pre_post(df), x="event_period", y=["goals_per90", "assists_per90"], barmode="group", title="Goals/Assists per 90 Pre vs Post Injury")
         st.plotly_chart(fig_ga, use_container_width=True)
 
     elif selected_global_chart == "Workload & Starts Distribution (injured vs non-injured)":
         # Compare match workload by injury status
         st.markdown("### 🔁 Workload & Starts Distribution")
-        df.loc[:, "injured_ever"] = df.groupby("player_name_matchlog")["injury"].transform("max")
-        fig_workload = px.box(df, x="injured_ever", y="minutes_played", points="all", title="Minutes Played: Injured vs Non-Injured")
+        # Boxes are drawn from precomputed quartiles so individual rows are not shipped to the browser
+        workload_q = workload_by_injury_status(df)
+        fig_workload = go.Figure(go.Box(
+            x=workload_q.index, q1=workload_q[0.25], median=workload_q[0.5], q3=workload_q[0.75],
+            lowerfence=workload_q[0.0], upperfence=workload_q[1.0], name="minutes_played"
+        ))
+        fig_workload.update_layout(title="Minutes Played: Injured vs Non-Injured", xaxis_title="injured_ever", yaxis_title="minutes_played")
         st.plotly_chart(fig_workload, use_container_width=True)
 
     elif selected_global_chart == "Events by Period":
         # Shows events (starts, subs, minutes) by injury recovery phase
         st.markdown("### Events by Period")
-        events_group = df.groupby("event_period")[["starts", "subs_in", "minutes_played"]].mean().reset_index()
-        fig_events = px.bar(events_group, x="event_period", y=["starts", "subs_in", "minutes_played"], barmode="group", title="Events by Period")
+        fig_events = px.bar(events_by_period(df), x="event_period", y=["starts", "subs_in", "minutes_played"], barmode="group", title="Events by Period")
         st.plotly_chart(fig_events, use_container_width=True)
 
     elif selected_global_chart == "Recovery Curve":
         # Plots average minutes played per matchday before and after injury
         st.markdown("### 📈 Recovery Curve")
-        recovery_df = df[df["event_period"].isin(["pre", "post"])]
-        recovery_curve = recovery_df.groupby(["event_period", "matchday"])["minutes_played"].mean().reset_index()
-        fig_recovery = px.line(recovery_curve, x="matchday", y="minutes_played", color="event_period", title="Avg Minutes per Game: Pre vs Post Injury")
+        fig_recovery = px.line(recovery_curve(df), x="matchday", y="minutes_played", color="event_period", title="Avg Minutes per Game: Pre vs Post Injury")
         st.plotly_chart(fig_recovery, use_container_width=True)
 
     # Sidebar filters allow users to subset the data
@@ -236,7 +317,7 @@ with tab1:
     event_period_options = ["pre", "during", "post"]
     selected_event_periods = st.sidebar.multiselect("Select Event Period", event_period_options, default=event_period_options)
     if "home_team_clean" in df.columns:
-        club_options = sorted(pd.concat([df["home_team_clean"], df["away_team_clean"]]).dropna().unique())
+        club_options = club_names(df)
         selected_clubs = st.sidebar.multiselect("Select Clubs", club_options, default=club_options)
     else:
         selected_clubs = []
@@ -244,16 +325,19 @@ with tab1:
     # Run filter button to subset data efficiently
     if "df_filtered" not in st.session_state:
         st.session_state.df_filtered = pd.DataFrame()
+        st.session_state.df_preview = pd.DataFrame()
 
     if st.sidebar.button("Run Filter"):
         with st.spinner("Filtering data, please wait..."):
-            st.session_state.df_filtered = filter_large_csv(
-                "feature_engineered_dataset.csv",
+            st.session_state.df_filtered = filter_parquet(
+                "feature_engineered_dataset.parquet",
                 season_options=selected_season,
                 position_options=selected_positions,
                 event_period_options=selected_event_periods,
                 club_options=selected_clubs
             )
+            # Keep the inspection preview as its own small frame instead of re-slicing on every rerun
+            st.session_state.df_preview = st.session_state.df_filtered.head(100).copy()
 
     df_filtered = st.session_state.df_filtered
 
@@ -343,17 +427,13 @@ with tab2:
     st.header("🏟️ Club & Player Explorer")
 
     # Club and season selector
-    club_options = sorted(pd.concat([df["home_team_clean"], df["away_team_clean"]]).dropna().unique())
+    club_options = club_names(df)
     selected_club = st.selectbox("Select a Club", club_options)
     season_options = sorted(df["season_epl"].dropna().unique())
     selected_season = st.selectbox("Select a Season", season_options)
 
     # Subset for club & season
-    club_name_for_data = CLUB_NAME_MAP.get(selected_club, selected_club)
-    club_df = df[
-        (df["season_epl"] == selected_season) &
-        (df["club_missed_games_for"] == club_name_for_data)
-    ]
+    club_df = df.iloc[club_season_positions(df).get((selected_club, selected_season), [])]
 
     # KPIs for club and season
     injured_players = club_df[club_df["injury"] == 1]["player_name_matchlog"].unique()
@@ -415,5 +495,5 @@ with tab2:
             )
             st.plotly_chart(fig_minutes_timeline, use_container_width=True)
 
-    # Display complete filtered DataFrame (optional for inspection)
-    st.dataframe(df_filtered.head(100))
+    # Display a preview of the filtered DataFrame (optional for inspection)
+    st.dataframe(st.session_state.df_preview)
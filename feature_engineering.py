@@ -10,14 +10,51 @@ Input:
   - final_merged_dataset_cleaned.csv
 
 Output:
-  - feature_engineered_dataset.csv
+  - feature_engineered_dataset.parquet
 """
 
 import pandas as pd
 import numpy as np
 import os
 
-df = pd.read_csv('final_merged_dataset_cleaned.csv', low_memory=False, parse_dates=['date', 'injured_since', 'injured_until'])
+# Matchlog short club names mapped to the full names used in the injury data
+CLUB_NAME_MAP = {
+    "Arsenal": "Arsenal FC",
+    "Aston Villa": "Aston Villa",
+    "Bournemouth": "AFC Bournemouth",
+    "Brentford": "Brentford FC",
+    "Brighton": "Brighton & Hove Albion",
+    "Burnley": "Burnley FC",
+    "Cardiff": "Cardiff City",
+    "Chelsea": "Chelsea FC",
+    "Crystal Palace": "Crystal Palace",
+    "Everton": "Everton FC",
+    "Forest": "Nottingham Forest",
+    "Fulham": "Fulham FC",
+    "Huddersfield": "Huddersfield Town",
+    "Hull City": "Hull City",
+    "Leeds": "Leeds United",
+    "Leicester": "Leicester City",
+    "Liverpool": "Liverpool FC",
+    "Luton": "Luton Town",
+    "Man City": "Manchester City",
+    "Man Utd": "Manchester United",
+    "Middlesbrough": "Middlesbrough FC",
+    "Newcastle": "Newcastle United",
+    "Norwich": "Norwich City",
+    "Sheff Utd": "Sheffield United",
+    "Southampton": "Southampton FC",
+    "Stoke City": "Stoke City",
+    "Sunderland": "Sunderland AFC",
+    "Swansea": "Swansea City",
+    "Tottenham": "Tottenham Hotspur",
+    "Watford": "Watford FC",
+    "West Brom": "West Bromwich Albion",
+    "West Ham": "West Ham United",
+    "Wolves": "Wolverhampton Wanderers"
+}
+
+df = pd.read_csv('final_merged_dataset_cleaned.csv', engine='pyarrow', parse_dates=['date', 'injured_since', 'injured_until'])
 
 # Ensure date columns are datetime
 if 'date' in df.columns:
@@ -29,48 +66,70 @@ if 'injured_until' in df.columns:
 
 df_filtered = df[df['date'].notna()].copy()
 
-# Extract season from match date
-def get_season(date):
-    if pd.isna(date):
-        return np.nan
-    year = date.year
-    if date.month >= 8:
-        return f"{year}/{year+1}"
-    else:
-        return f"{year-1}/{year}"
-df_filtered['season_epl'] = df_filtered['date'].apply(get_season)
+# Normalise home/away club names once so they match club_missed_games_for
+# The map is applied to each column's category dictionary and rows are re-pointed by integer code
+for col in ['home_team_clean', 'away_team_clean']:
+    if col in df_filtered.columns:
+        teams = df_filtered[col].astype('category')
+        full_names = np.array([CLUB_NAME_MAP.get(c, c) for c in teams.cat.categories], dtype=object)
+        club_labels, remap = np.unique(full_names, return_inverse=True)
+        codes = teams.cat.codes.to_numpy()
+        df_filtered[col] = pd.Categorical.from_codes(np.where(codes >= 0, remap[codes], -1), categories=club_labels)
 
-# Calculate rolling averages for minutes played (captures acute workload)
+# Extract season from match date (seasons start in August)
+# Labels are built once per season and rows only store integer codes into them
+season_start = (df_filtered['date'].dt.year - (df_filtered['date'].dt.month < 8)).to_numpy()
+if len(season_start) == 0:
+    df_filtered['season_epl'] = pd.Categorical([])
+else:
+    first_season = season_start.min()
+    season_labels = [f"{y}/{y+1}" for y in range(first_season, season_start.max() + 1)]
+    df_filtered['season_epl'] = pd.Categorical.from_codes(season_start - first_season, categories=season_labels).remove_unused_categories()
+
+# Player keys are categorical so the sort and every groupby below work on integer codes
+df_filtered['player_name_clean'] = df_filtered['player_name_clean'].astype('category')
+
+# Rolling mean and standard deviation of minutes played share one grouped window
 df_filtered = df_filtered.sort_values(['player_name_clean', 'date'])
-df_filtered['minutes_workload_last5'] = (
-    df_filtered.groupby('player_name_clean')['minutes_played']
-    .transform(lambda x: x.rolling(window=5, min_periods=1).mean())
+minutes_last5 = (
+    df_filtered.groupby('player_name_clean', observed=True, sort=False)['minutes_played']
+    .rolling(window=5, min_periods=1).agg(['mean', 'std'])
+    .reset_index(level=0, drop=True)
 )
 
+# Calculate rolling averages for minutes played (captures acute workload)
+df_filtered['minutes_workload_last5'] = minutes_last5['mean']
+
 # Calculate total days missed per season (injury burden)
 if 'injured_since' in df_filtered.columns and 'injured_until' in df_filtered.columns:
     df_filtered['injury_days'] = (df_filtered['injured_until'] - df_filtered['injured_since']).dt.days
-    injury_burden = df_filtered.groupby(['player_name_clean', 'season_epl'])['injury_days'].sum().reset_index()
-    injury_burden.rename(columns={'injury_days': 'injury_burden_days'}, inplace=True)
-    df_filtered = df_filtered.merge(injury_burden, on=['player_name_clean', 'season_epl'], how='left')
+    injury_burden = (
+        df_filtered.groupby(['player_name_clean', 'season_epl'], observed=True)['injury_days']
+        .sum().rename('injury_burden_days')
+    )
+    df_filtered = df_filtered.join(injury_burden, on=['player_name_clean', 'season_epl'])
 
 # Rolling standard deviation of minutes played (form consistency indicator)
-df_filtered['form_consistency_last5'] = (
-    df_filtered.groupby('player_name_clean')['minutes_played']
-    .transform(lambda x: x.rolling(window=5, min_periods=1).std())
-)
+df_filtered['form_consistency_last5'] = minutes_last5['std']
 
 # Assign event period: pre, during, post injury
-def get_event_period(row):
-    if pd.isna(row.get('injured_since')) or pd.isna(row.get('injured_until')) or pd.isna(row.get('date')):
-        return np.nan
-    if row['date'] < row['injured_since']:
-        return 'pre'
-    elif row['injured_since'] <= row['date'] <= row['injured_until']:
-        return 'during'
-    else:
-        return 'post'
-df_filtered['event_period'] = df_filtered.apply(get_event_period, axis=1)
-
-df_filtered.to_csv('feature_engineered_dataset.csv', index=False)
-print("Feature engineering complete. Saved as 'feature_engineered_dataset.csv'")
+match_date = df_filtered['date'].values
+injured_since = df_filtered['injured_since'].values
+injured_until = df_filtered['injured_until'].values
+has_dates = ~(np.isnat(match_date) | np.isnat(injured_since) | np.isnat(injured_until))
+event_period = np.select(
+    [match_date < injured_since, match_date <= injured_until],
+    ['pre', 'during'],
+    default='post'
+)
+df_filtered['event_period'] = pd.Series(event_period, index=df_filtered.index).where(has_dates)
+
+# Repetitive text columns are stored as dictionary-encoded categoricals
+category_cols = [
+    'season_epl', 'position_type', 'event_period', 'home_team_clean', 'away_team_clean',
+    'club_missed_games_for', 'injury_type', 'player_name_matchlog'
+]
+df_filtered.astype({c: 'category' for c in category_cols if c in df_filtered.columns}).to_parquet(
+    'feature_engineered_dataset.parquet', compression='snappy', use_dictionary=True, index=False
+)
+print("Feature engineering complete. Saved as 'feature_engineered_dataset.parquet'")
@@ -8,9 +8,9 @@ Description:
   Implements the merging methodology described in Section 3.6 of the dissertation.
 
 Inputs:
-  - intermediate/epl_matchlogs_cleaned.csv
-  - intermediate/epl_player_summaries_cleaned_final.csv
-  - intermediate/injury_data_cleaned.csv
+  - intermediate/epl_matchlogs_cleaned.parquet
+  - intermediate/epl_player_summaries_cleaned_final.parquet
+  - intermediate/injury_data_cleaned.parquet
 
 Output:
   - final_merged_dataset.csv
@@ -19,13 +19,27 @@ Output:
 import pandas as pd
 import os
 
-matchlog_df = pd.read_csv('intermediate/epl_matchlogs_cleaned.csv', parse_dates=['date'])
-summaries_df = pd.read_csv('intermediate/epl_player_summaries_cleaned_final.csv')
-injury_path = 'intermediate/injury_data_cleaned.csv'
+# Lower the name keys with the same Arrow string kernels Pre-Processing.py used for the summary key
+pd.options.future.infer_string = True
+
+matchlog_df = pd.read_parquet('intermediate/epl_matchlogs_cleaned.parquet')
+summaries_df = pd.read_parquet('intermediate/epl_player_summaries_cleaned_final.parquet')
+injury_path = 'intermediate/injury_data_cleaned.parquet'
+injuries_df = pd.read_parquet(injury_path) if os.path.exists(injury_path) else None
 
 # Standardize player names for merging
 matchlog_df['player_name_clean'] = matchlog_df['player_name'].str.lower().str.strip()
 summaries_df['player_name_clean'] = summaries_df['player_name_clean'].str.lower().str.strip()
+if injuries_df is not None:
+    injuries_df['player_name_clean'] = injuries_df['player_name'].str.lower().str.strip()
+
+# Share one categorical dtype for the name key so the merges join on integer codes
+name_frames = [f for f in (matchlog_df, summaries_df, injuries_df) if f is not None]
+name_dtype = pd.CategoricalDtype(
+    pd.concat([f['player_name_clean'] for f in name_frames]).dropna().unique()
+)
+for frame in name_frames:
+    frame['player_name_clean'] = frame['player_name_clean'].astype(name_dtype)
 
 # Merge matchlog with summary stats on common keys
 merge_keys = ['player_name_clean', 'season', 'club_id']
@@ -33,15 +47,15 @@ merge_keys = [k for k in merge_keys if k in summaries_df.columns and k in matchl
 merged_df = pd.merge(matchlog_df, summaries_df, how='left', on=merge_keys)
 
 # Merge in injury info if available and create injury period flag
-if os.path.exists(injury_path):
-    injuries_df = pd.read_csv(injury_path, parse_dates=['injured_since', 'injured_until'])
-    injuries_df['player_name_clean'] = injuries_df['player_name'].str.lower().str.strip()
+if injuries_df is not None:
+    injuries_df['injured_since'] = pd.to_datetime(injuries_df['injured_since'], errors='coerce')
+    injuries_df['injured_until'] = pd.to_datetime(injuries_df['injured_until'], errors='coerce')
     merged_df = pd.merge(merged_df, injuries_df, how='left', on='player_name_clean')
     # Flag if the match occurred during the player's injury spell
     if 'injured_since' in merged_df.columns and 'injured_until' in merged_df.columns:
-        merged_df['is_during_injury'] = merged_df.apply(
-            lambda row: row['injured_since'] <= row['date'] <= row['injured_until']
-            if pd.notnull(row['injured_since']) and pd.notnull(row['injured_until']) else False, axis=1
+        # Missing dates compare as False, so rows without an injury spell are not flagged
+        merged_df['is_during_injury'] = (
+            merged_df['injured_since'].le(merged_df['date']) & merged_df['date'].le(merged_df['injured_until'])
         )
 
 merged_df.to_csv('final_merged_dataset.csv', index=False)
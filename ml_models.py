@@ -5,11 +5,12 @@ import os
 import matplotlib.pyplot as plt
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import (
-    accuracy_score, precision_score, recall_score, f1_score, roc_auc_score, roc_curve
+    accuracy_score, precision_score, recall_score, roc_auc_score, roc_curve, precision_recall_curve
 )
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.linear_model import LogisticRegression
 from imblearn.over_sampling import SMOTE
+from imblearn.under_sampling import RandomUnderSampler
 from sklearn.impute import SimpleImputer
 
 # Optional: Import XGBoost if available
@@ -23,7 +24,7 @@ except ImportError:
 # =========================
 # Load dataset
 # =========================
-df = pd.read_csv("feature_engineered_dataset.csv", parse_dates=["date"])
+df = pd.read_parquet("feature_engineered_dataset.parquet")
 print(f"✅ Dataset loaded: {df.shape}")
 
 # =========================
@@ -45,7 +46,8 @@ df = df.drop(columns=[c for c in leakage_cols if c in df.columns], errors="ignor
 # Injury Risk Prediction
 # =========================
 if "injury" in df.columns:
-    X = df.select_dtypes(include=[np.number]).drop(columns=["injury"], errors="ignore")
+    # Features are trained in float32 to halve the memory moved by SMOTE and the models
+    X = df.select_dtypes(include=[np.number]).drop(columns=["injury"], errors="ignore").astype(np.float32)
     y = df["injury"]
 
     print("Injury distribution:")
@@ -67,16 +69,24 @@ if "injury" in df.columns:
     X_test = X_test[X_train.columns]
     X_test = pd.DataFrame(imputer.transform(X_test), columns=X_train.columns, index=X_test.index)
 
+    # Cap the majority class at 10x the minority so SMOTE's neighbour search stays small
+    X_train_cap, y_train_cap = X_train, y_train
+    class_counts = y_train.value_counts()
+    if class_counts.min() / class_counts.max() < 0.1:
+        undersampler = RandomUnderSampler(random_state=42, sampling_strategy=0.1)
+        X_train_cap, y_train_cap = undersampler.fit_resample(X_train, y_train)
+        print("After undersampling:", np.bincount(y_train_cap))
+
     # Balance classes with SMOTE (synthetic oversampling)
     smote = SMOTE(random_state=42, sampling_strategy=0.2)
-    X_train_bal, y_train_bal = smote.fit_resample(X_train, y_train)
+    X_train_bal, y_train_bal = smote.fit_resample(X_train_cap, y_train_cap)
     print("After SMOTE:", np.bincount(y_train_bal))
 
     # =========================
     # Model Definitions
     # =========================
     models = {
-        "RandomForest": RandomForestClassifier(n_estimators=300, class_weight="balanced", random_state=42),
+        "RandomForest": RandomForestClassifier(n_estimators=300, class_weight="balanced", n_jobs=-1, random_state=42),
         "LogisticRegression": LogisticRegression(max_iter=1000, class_weight="balanced", random_state=42)
     }
     if xgb_available:
@@ -84,6 +94,9 @@ if "injury" in df.columns:
             n_estimators=300,
             scale_pos_weight=(y_train_bal.value_counts()[0] / y_train_bal.value_counts()[1]),
             use_label_encoder=False,
+            tree_method="hist",
+            max_bin=256,
+            n_jobs=-1,
             eval_metric="logloss",
             random_state=42
         )
@@ -95,13 +108,15 @@ if "injury" in df.columns:
         model.fit(X_train_bal, y_train_bal)
         y_probs = model.predict_proba(X_test)[:, 1]
 
-        # Tune threshold for best F1
+        # Tune threshold for best F1 over every distinct score between 0.1 and 0.9
+        prec, rec, thresholds = precision_recall_curve(y_test, y_probs)
+        prec, rec = prec[:-1], rec[:-1]
+        f1s = np.divide(2 * prec * rec, prec + rec, out=np.zeros_like(prec), where=(prec + rec) > 0)
+        f1s[(thresholds < 0.1) | (thresholds > 0.9)] = 0
         best_f1, best_thresh = 0, 0.5
-        for thresh in np.linspace(0.1, 0.9, 20):
-            preds = (y_probs >= thresh).astype(int)
-            f1 = f1_score(y_test, preds)
-            if f1 > best_f1:
-                best_f1, best_thresh = f1, thresh
+        if f1s.max() > 0:
+            best = f1s.argmax()
+            best_f1, best_thresh = f1s[best], thresholds[best]
 
         y_pred = (y_probs >= best_thresh).astype(int)
 
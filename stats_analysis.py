@@ -8,7 +8,7 @@ Description:
   This script implements the statistical methodology described in Section 3.8 of the dissertation.
 
 Inputs:
-  - feature_engineered_dataset.csv
+  - feature_engineered_dataset.parquet
 
 Outputs:
   - outputs/episode_level_pre_post.csv       # Per-episode summary of pre/post metrics
@@ -19,13 +19,20 @@ Outputs:
 import os
 import numpy as np
 import pandas as pd
+import pyarrow.parquet as pq
 from scipy.stats import ttest_rel, f_oneway
 
 os.makedirs("outputs", exist_ok=True)
 
 # --- Load feature-engineered dataset ---
-DF_PATH = "feature_engineered_dataset.csv"
-df = pd.read_csv(DF_PATH, low_memory=False, parse_dates=["date", "injured_since", "injured_until"])
+DF_PATH = "feature_engineered_dataset.parquet"
+# Only the columns used below are read; any that are absent are filled in afterwards
+STATS_COLS = [
+    "player_name", "player_name_clean", "date", "position_type", "minutes_played",
+    "goals", "assists", "injured_since", "injured_until"
+]
+available_cols = set(pq.read_schema(DF_PATH).names)
+df = pd.read_parquet(DF_PATH, columns=[c for c in STATS_COLS if c in available_cols])
 
 # --- Ensure required columns exist for compatibility ---
 for col in ["player_name", "player_name_clean"]:
@@ -48,17 +55,13 @@ df["primary_position"] = df["position_type"].str.split(r"[,/]").str[0].str.strip
 
 def simplify_position(pos):
     """
-    Simplify a position string to broad categories: GK, DF, MF, FW, or Hybrid.
+    Simplify position strings to broad categories: GK, DF, MF, FW, or Hybrid.
     """
-    if pd.isna(pos): return "Unknown"
-    pos = pos.upper()
-    if "GK" in pos: return "GK"
-    if "DF" in pos: return "DF"
-    if "MF" in pos: return "MF"
-    if "FW" in pos: return "FW"
-    return "Hybrid"
+    pos = pos.str.upper()
+    conditions = [pos.isna()] + [pos.str.contains(code, regex=False, na=False) for code in ["GK", "DF", "MF", "FW"]]
+    return np.select(conditions, ["Unknown", "GK", "DF", "MF", "FW"], default="Hybrid")
 
-df["broad_position"] = df["primary_position"].apply(simplify_position)
+df["broad_position"] = simplify_position(df["primary_position"])
 
 # --- Unique match rows to avoid duplication from merges ---
 matches = (
@@ -74,8 +77,11 @@ def rate_per90(numer, mins):
     """
     Calculate a per-90-minutes rate, handling divide by zero.
     """
-    mins = np.where(mins <= 0, np.nan, mins)
-    return (numer / mins) * 90
+    numer = np.asarray(numer, dtype=float)
+    mins = np.asarray(mins, dtype=float)
+    rate = np.divide(numer, mins, out=np.full(len(mins), np.nan), where=mins > 0)
+    rate *= 90
+    return rate
 
 matches["goals90"] = rate_per90(matches["goals"], matches["minutes_played"])
 matches["assists90"] = rate_per90(matches["assists"], matches["minutes_played"])
@@ -92,57 +98,54 @@ episodes = (
 WIN_PRE = 5   # Number of matches before injury to consider
 WIN_POST = 5  # Number of matches after injury to consider
 
-rows = []
-for _, ep in episodes.iterrows():
-    p = ep["player_name_clean"]
-    pos = ep.get("position_type", np.nan)
-    start = ep["injured_since"]
-    end = ep["injured_until"]
-
-    pm = matches[matches["player_name_clean"] == p].copy()
-    if pm.empty or pd.isna(start) or pd.isna(end):
-        continue
-
-    # PRE: last WIN_PRE matches strictly before injury start
-    pre = pm[pm["date"] < start].tail(WIN_PRE)
-    # POST: first WIN_POST matches strictly after injury return
-    post = pm[pm["date"] > end].head(WIN_POST)
-
-    if pre.empty or post.empty:
-        continue
-
-    def agg(block):
-        return pd.Series({
-            "n_matches": len(block),
-            "minutes_mean": block["minutes_played"].mean(),
-            "goals90_mean": block["goals90"].mean(),
-            "assists90_mean": block["assists90"].mean()
-        })
-
-    pre_agg = agg(pre)
-    post_agg = agg(post)
-
-    rows.append({
-        "player_name_clean": p,
-        "player_name": ep.get("player_name", p),
-        "position_type": pos,
-        "primary_position": str(pos).split(",")[0].split("/")[0].strip() if pd.notna(pos) else np.nan,
-        "injured_since": start,
-        "injured_until": end,
-        "pre_n_matches": pre_agg["n_matches"],
-        "pre_minutes_mean": pre_agg["minutes_mean"],
-        "pre_goals90_mean": pre_agg["goals90_mean"],
-        "pre_assists90_mean": pre_agg["assists90_mean"],
-        "post_n_matches": post_agg["n_matches"],
-        "post_minutes_mean": post_agg["minutes_mean"],
-        "post_goals90_mean": post_agg["goals90_mean"],
-        "post_assists90_mean": post_agg["assists90_mean"],
-        "delta_minutes_mean": post_agg["minutes_mean"] - pre_agg["minutes_mean"],
-        "delta_goals90_mean": post_agg["goals90_mean"] - pre_agg["goals90_mean"],
-        "delta_assists90_mean": post_agg["assists90_mean"] - pre_agg["assists90_mean"],
-    })
-
-episode_level = pd.DataFrame(rows)
+# Number each player's matches in date order so windows can be gathered by position
+matches["match_pos"] = matches.groupby("player_name_clean", sort=False).cumcount()
+match_keys = matches[["player_name_clean", "date", "match_pos"]].sort_values("date")
+
+def anchor_match(date_col, direction):
+    """
+    Position of the player's nearest match strictly before (or after) each episode date.
+    """
+    anchors = pd.merge_asof(
+        episodes[["player_name_clean", date_col]].reset_index().sort_values(date_col),
+        match_keys, left_on=date_col, right_on="date", by="player_name_clean",
+        direction=direction, allow_exact_matches=False
+    )
+    return anchors.set_index("index")["match_pos"].dropna().astype(int)
+
+def window_agg(anchor, offsets):
+    """
+    Aggregate the matches at the given position offsets from each episode's anchor match.
+    Offsets that fall outside a player's match history simply find no rows.
+    """
+    window = pd.DataFrame({
+        "episode": np.repeat(anchor.index.to_numpy(), len(offsets)),
+        "player_name_clean": np.repeat(episodes.loc[anchor.index, "player_name_clean"].to_numpy(), len(offsets)),
+        "match_pos": (anchor.to_numpy()[:, None] + offsets).ravel()
+    }).merge(matches, on=["player_name_clean", "match_pos"])
+    return window.groupby("episode").agg(
+        n_matches=("match_pos", "size"),
+        minutes_mean=("minutes_played", "mean"),
+        goals90_mean=("goals90", "mean"),
+        assists90_mean=("assists90", "mean")
+    )
+
+# PRE: last WIN_PRE matches strictly before injury start
+pre_agg = window_agg(anchor_match("injured_since", "backward"), np.arange(1 - WIN_PRE, 1))
+# POST: first WIN_POST matches strictly after injury return
+post_agg = window_agg(anchor_match("injured_until", "forward"), np.arange(WIN_POST))
+
+# Episodes without both a pre and a post window are dropped
+episode_level = episodes.join(pre_agg.add_prefix("pre_"), how="inner").join(post_agg.add_prefix("post_"), how="inner")
+episode_level["primary_position"] = episode_level["position_type"].str.split(r"[,/]").str[0].str.strip()
+for metric in ["minutes_mean", "goals90_mean", "assists90_mean"]:
+    episode_level[f"delta_{metric}"] = episode_level[f"post_{metric}"] - episode_level[f"pre_{metric}"]
+episode_level = episode_level[[
+    "player_name_clean", "player_name", "position_type", "primary_position", "injured_since", "injured_until",
+    "pre_n_matches", "pre_minutes_mean", "pre_goals90_mean", "pre_assists90_mean",
+    "post_n_matches", "post_minutes_mean", "post_goals90_mean", "post_assists90_mean",
+    "delta_minutes_mean", "delta_goals90_mean", "delta_assists90_mean"
+]].reset_index(drop=True)
 episode_level.to_csv("outputs/episode_level_pre_post.csv", index=False)
 
 # --- Paired t-tests on pre/post differences (only for players with both) ---